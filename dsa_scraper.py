@@ -1,20 +1,26 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
+import lxml.html
+from lxml import etree
+import codecs
+import diskcache
 import pandas as pd
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
 import re
 import json
+import random
 import traceback
-from urllib.parse import urljoin, urlparse, parse_qs
-from fake_useragent import UserAgent
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-from typing import Dict, List, Optional, Tuple, Any
+from collections import deque
+from urllib.parse import urljoin
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from pathlib import Path
 import io
+import queue
+import threading
 from address_normalizer import AddressNormalizer
 
 # Configure logging
@@ -29,338 +35,615 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Namespace for EXSLT regular expressions in lxml XPath queries
+_REGEXP_NS = {'re': 'http://exslt.org/regular-expressions'}
+
+# Detail page labels mapped to output column names
+FIELD_MAPPINGS = {
+    'Office ID:': 'Office ID',
+    'Application #:': 'Application #',
+    'File #:': 'File #',
+    'PTN #:': 'PTN #',
+    'OPSC #:': 'OPSC #',
+    'Project Type:': 'Project Type',
+    'Project Class:': 'Project Class',
+    'Special Type:': 'Special Type',
+    '# Of Incr:': 'Number of Increments',
+    'Address:': 'Address',
+    'City:': 'City',
+    'Zip:': 'Zip',
+    'Estimated Amt:': 'Estimated Amount',
+    'Contracted Amt:': 'Contracted Amount',
+    'Construction Change Document Amt:': 'Change Document Amount',
+    'Final Project Cost:': 'Final Project Cost',
+    'Adj Est.Date#1:': 'Adjustment Date 1',
+    'Adj Est.Amt#1:': 'Adjustment Amount 1',
+    'Adj Est.Date#2:': 'Adjustment Date 2',
+    'Adj Est.Amt#2:': 'Adjustment Amount 2',
+    'Received Date:': 'Received Date',
+    'Approved Date:': 'Approved Date',
+    'Approval Ext. Date:': 'Approval Extension Date',
+    'Closed Date:': 'Closed Date',
+    'Complete Submittal Received Date:': 'Complete Submittal Date'
+}
+
+# Checkbox labels on the detail page
+INDICATORS = {
+    'SB 575': 'SB 575',
+    'New Campus': 'New Campus',
+    'Modernization': 'Modernization',
+    'Auto Fire Detection': 'Auto Fire Detection',
+    'Sprinkler System': 'Sprinkler System',
+    'Access Compliance': 'Access Compliance',
+    'Fire & Life Safety': 'Fire & Life Safety',
+    'Structural Safety': 'Structural Safety',
+    'Field Review': 'Field Review',
+    'CGS Review': 'CGS Review',
+    'HPS': 'HPS'
+}
+
+# Detail columns with a handful of repeated values, stored as pandas categories
+CATEGORY_COLUMNS = ['Project Type', 'Project Class', 'Project Cert Type', *INDICATORS.values()]
+
+# Fallback certification strings searched for on the Project Certification page
+CERT_PATTERNS = [
+    r'#\d+-Certification & Close of File(?:\s+Per EDU Code \d+\(\w+\)\s+OR\s+\d+\(\w+\))?',
+    r'DSA 301P Notification of Requirement for Certification',
+    r'#\d+-Close of File w/o Certification - Exceptions',
+    r'1 YR VOID'
+]
+
+# On-disk response cache location and time-to-live, in seconds
+CACHE_DIR = '.dsa_cache'
+CACHE_TTL = 24 * 60 * 60
+
+# ID of the project table on ProjectList.aspx
+PROJECT_TABLE_ID = 'ctl00_MainContent_gdvsch'
+
+# Bytes read per chunk when streaming the project listing
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Most recent error messages kept on a scraper for debugging
+DEBUG_INFO_LIMIT = 200
+
+# Rows per page in the result previews; the workbook always has every row
+PREVIEW_ROWS = 1000
+
+# Project count above which the Excel workbook is only built on request; CSV is offered at any size
+XLSX_ROW_LIMIT = 100_000
+
+# Fixed pixel height of the result previews, so the grid lays out once
+PREVIEW_HEIGHT = 600
+
+# Excel column width and number format for detail-sheet columns; others get the default
+COLUMN_SPECS = {
+    'Estimated Amount': (15, 'money'),
+    'Contracted Amount': (15, 'money'),
+    'Change Document Amount': (15, 'money'),
+    'Final Project Cost': (15, 'money'),
+    'Received Date': (12, 'date'),
+    'Approved Date': (12, 'date'),
+    'Closed Date': (12, 'date')
+}
+DEFAULT_COLUMN_SPEC = (20, None)
+
+# Seconds between checks of a background scrape's progress queue
+PROGRESS_POLL_INTERVAL = 0.2
+
+# Minimum seconds between scrape progress updates
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Seconds to wait for a connection and between reads before a request attempt fails
+CONNECT_TIMEOUT = 15
+READ_TIMEOUT = 30
+
+# Seconds an idle pooled connection is kept open for reuse
+KEEPALIVE_TIMEOUT = 60
+
+# Seconds to cache DNS lookups for the tracker host
+DNS_CACHE_TTL = 300
+
+# Retry backoff cap and random jitter, in seconds
+MAX_BACKOFF = 30
+BACKOFF_JITTER = 0.5
+
+# Regexes are compiled once here rather than for every project page
+_QUERY_ID_RE = re.compile(r'[?&](OriginId|AppId)=([^&#]*)')
+_CERT_PATTERN_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in CERT_PATTERNS), re.I)
+
+def _label_key(text: str) -> str:
+    """Normalize cell text for case- and whitespace-insensitive label lookups."""
+    return ' '.join(text.split()).lower()
+
+# Normalized label lookups, so each page is matched by hash instead of regex scans
+_FIELD_LABELS = {_label_key(field): key for field, key in FIELD_MAPPINGS.items()}
+_INDICATOR_LABELS = {_label_key(indicator): key for indicator, key in INDICATORS.items()}
+
+def _describe_error(e: Exception) -> str:
+    """Describe an exception, formatting the full traceback only when debug logging is on."""
+    if logger.isEnabledFor(logging.DEBUG):
+        return f"{str(e)}\n{traceback.format_exc()}"
+    return str(e)
+
+class _CellTarget:
+    """lxml parser target recording table cell text and the checkbox state before each indicator."""
+
+    def __init__(self):
+        self.cell_texts = []
+        self.indicator_states = {}
+        self._open_cells = []  # (index into cell_texts, last checkbox state when the cell opened)
+        self._checkbox_checked = False
+        self._text = []
+
+    def _flush_text(self) -> None:
+        # Like get_text(strip=True): strip each text node, then join without a separator
+        if self._text:
+            piece = ''.join(self._text).strip()
+            self._text = []
+            if piece:
+                for index, _ in self._open_cells:
+                    self.cell_texts[index] += piece
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        self._flush_text()
+        if tag == 'td':
+            self._open_cells.append((len(self.cell_texts), self._checkbox_checked))
+            self.cell_texts.append('')
+        elif tag == 'input' and attrib.get('type') == 'checkbox':
+            self._checkbox_checked = 'checked' in attrib
+
+    def end(self, tag: str) -> None:
+        self._flush_text()
+        if tag == 'td' and self._open_cells:
+            index, checked = self._open_cells.pop()
+            indicator = _INDICATOR_LABELS.get(_label_key(self.cell_texts[index]))
+            if indicator:
+                self.indicator_states.setdefault(indicator, 'Yes' if checked else 'No')
+
+    def data(self, data: str) -> None:
+        if self._open_cells:
+            self._text.append(data)
+
+    def close(self) -> Tuple[List[str], Dict[str, str]]:
+        return self.cell_texts, self.indicator_states
+
+def _parse_cells(html: str) -> Tuple[List[str], Dict[str, str]]:
+    """Parse a summary page once without building a tree, returning cell texts and indicator states."""
+    parser = etree.HTMLParser(target=_CellTarget())
+    parser.feed(html)
+    return parser.close()
+
+def _find_cert_type(cert_html: str) -> str:
+    """Read the last certification letter type from a Project Certification page."""
+    # The cert page only needs a single lookup, so query an lxml tree directly
+    cert_tree = lxml.html.fromstring(cert_html)
+    
+    # Look for Last Certification Letter Type in any innermost table cell, including text in child tags
+    next_cells = cert_tree.xpath(
+        "//td[not(.//td)][re:test(normalize-space(.), 'Last Certification Letter Type:', 'i')]/following::td[1]",
+        namespaces=_REGEXP_NS
+    )
+    cert_type = next_cells[0].text_content().strip() if next_cells else ""
+    
+    # If not found, stop at the first text node matching any of the certification patterns
+    if not cert_type:
+        cert_type = next(
+            (text.strip() for text in cert_tree.itertext() if _CERT_PATTERN_RE.search(text)),
+            ""
+        )
+    return cert_type
+
+# Used when fake_useragent can't load its browser data
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+@st.cache_resource
+def _load_user_agents(count: int = 32) -> List[str]:
+    """Sample a pool of user agents on first use; Streamlit reruns and new sessions share it."""
+    try:
+        # Imported here so app start and widget reruns never load the fake_useragent data
+        from fake_useragent import UserAgent
+        ua = UserAgent()
+        return [ua.random for _ in range(count)]
+    except Exception as e:
+        logger.warning(f"Could not load user agents, using default: {str(e)}")
+        return [DEFAULT_USER_AGENT]
+
+@st.cache_resource
+def _open_cache() -> diskcache.Cache:
+    """Open the response cache once per process so every scrape shares one handle."""
+    return diskcache.Cache(CACHE_DIR)
+
+class _RateLimiter:
+    """Spaces request starts across all concurrent fetches to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self) -> None:
+        """Reserve the next free slot and sleep until it arrives."""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
 class DSAScraper:
-    def __init__(self, use_proxy: bool = False, proxy: Optional[str] = None, request_delay: float = 0.0):
-        """Initialize the DSA scraper with optional proxy support."""
+    def __init__(self, use_proxy: bool = False, proxy: Optional[str] = None, max_rate: float = 0.0,
+                 max_concurrency: int = 16, use_cache: bool = False):
+        """Initialize the DSA scraper with optional proxy support and response caching."""
         self.base_url = "https://www.apps2.dgs.ca.gov/dsa/tracker/"
-        self.session = self._create_session()
-        self.debug_info = []
+        self.debug_info = deque(maxlen=DEBUG_INFO_LIMIT)
         self.use_proxy = use_proxy
         self.proxy = proxy
-        self.request_delay = request_delay
+        self.limiter = _RateLimiter(max_rate)
+        self.max_concurrency = max_concurrency
+        self.cache = _open_cache() if use_cache else None
         self.stats = {
             'total_requests': 0,
             'successful_requests': 0,
             'failed_requests': 0,
+            'cancelled_requests': 0,
+            'cache_hits': 0,
+            'cert_pages_skipped': 0,
             'start_time': datetime.now()
         }
         
-    def _create_session(self) -> requests.Session:
-        """Create a requests session with retries and rotating user agents."""
-        session = requests.Session()
-        
-        # Configure retries
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create an aiohttp session with a pooled connector and rotating user agents."""
+        # Each worker can have its summary and certification requests in flight at once,
+        # so allow two pooled connections per worker. Idle connections are kept long
+        # enough to survive backoff and rate-limit pauses, and DNS is cached for the
+        # whole run since every request goes to one host
+        connector = aiohttp.TCPConnector(
+            limit=2 * self.max_concurrency,
+            limit_per_host=2 * self.max_concurrency,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
         
         # Set up rotating user agent
-        ua = UserAgent()
-        session.headers.update({
-            'User-Agent': ua.random,
+        headers = {
+            'User-Agent': random.choice(_load_user_agents()),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
-        })
-        return session
+        }
+        # Per-socket timeouts rather than a total, so long streamed listings aren't cut off
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout)
 
-    def _make_request(self, url: str, method: str = 'get', data: Optional[Dict] = None, retries: int = 3) -> Optional[requests.Response]:
-        """Make HTTP request with proxy support and error handling."""
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, retries: int = 3, cacheable: bool = True,
+                     feed: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Fetch a page body with proxy support, response caching and error handling."""
+        streamed = False
+        if cacheable and feed is None and self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+        
         for attempt in range(retries):
+            sent = False
             try:
-                # Add delay between requests
-                if self.request_delay > 0:
-                    time.sleep(self.request_delay)
+                # Cap the overall request rate without serializing concurrent fetches
+                await self.limiter.wait()
 
                 kwargs = {}
                 if self.use_proxy and self.proxy:
-                    kwargs['proxies'] = {
-                        'http': self.proxy,
-                        'https': self.proxy
-                    }
+                    kwargs['proxy'] = self.proxy
                 
-                if method.lower() == 'post':
-                    response = self.session.post(url, data=data, **kwargs)
-                else:
-                    response = self.session.get(url, **kwargs)
+                self.stats['total_requests'] += 1
+                sent = True
+                async with session.get(url, **kwargs) as response:
+                    if response.status == 429:  # Rate limited
+                        # Jitter the wait too, so workers limited together don't all retry at once
+                        wait_time = self._retry_after(response.headers.get('Retry-After')) + random.random() * BACKOFF_JITTER
+                        logger.warning(f"Rate limited. Waiting {wait_time:.1f} seconds...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    response.raise_for_status()
+                    if feed is not None:
+                        # Hand decoded chunks to the caller as they arrive instead of buffering the page
+                        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+                        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                            streamed = True
+                            feed(decoder.decode(chunk))
+                        feed(decoder.decode(b'', final=True))
+                        text = ''
+                    else:
+                        text = await response.text()
+                        # Pages the server marks as no-store are never written to the cache
+                        cacheable = cacheable and 'no-store' not in response.headers.get('Cache-Control', '').lower()
                 
-                response.raise_for_status()
                 self.stats['successful_requests'] += 1
-                return response
+                if cacheable and feed is None and self.cache is not None:
+                    self.cache.set(url, text, expire=CACHE_TTL)
+                return text
                 
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:  # Rate limited
-                    wait_time = int(e.response.headers.get('Retry-After', 60))
-                    logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
+            except asyncio.CancelledError:
+                # A dropped speculative fetch is neither a success nor a failure
+                if sent:
+                    self.stats['cancelled_requests'] += 1
                 raise
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500 or attempt == retries - 1:
+                    self.stats['failed_requests'] += 1
+                    raise
+                logger.error(f"Request failed (attempt {attempt + 1}/{retries}): {str(e)}")
+                await asyncio.sleep(self._backoff(attempt))
             except Exception as e:
                 logger.error(f"Request failed (attempt {attempt + 1}/{retries}): {str(e)}")
-                if attempt == retries - 1:
+                # A partially streamed body can't be replayed into the caller's parser
+                if attempt == retries - 1 or streamed:
                     self.stats['failed_requests'] += 1
                     raise
-                time.sleep(2 ** attempt)  # Exponential backoff
+                await asyncio.sleep(self._backoff(attempt))
                 
         return None
 
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Capped exponential backoff with jitter so concurrent retries don't fire in lockstep."""
+        return min(2 ** attempt, MAX_BACKOFF) + random.random() * BACKOFF_JITTER
+
+    @staticmethod
+    def _retry_after(value: Optional[str], default: float = 60) -> float:
+        """Parse a Retry-After header given either as seconds or as an HTTP date."""
+        if not value:
+            return default
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return default
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
     def get_project_list(self, client_id: str, progress_bar: Optional[Any] = None, status_text: Optional[Any] = None) -> List[Dict]:
         """Get list of all projects with enhanced error handling and debugging."""
+        return asyncio.run(self._get_project_list(client_id, progress_bar, status_text))
+
+    async def _get_project_list(self, client_id: str, progress_bar: Optional[Any] = None, status_text: Optional[Any] = None) -> List[Dict]:
+        """Stream the project table, starting each project's detail fetch as soon as its row is parsed."""
         url = f"{self.base_url}ProjectList.aspx?ClientId={client_id}"
         
         try:
-            response = self._make_request(url)
-            if not response:
-                return []
-            
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Find the specific project table by ID
-            table = soup.find('table', {'id': 'ctl00_MainContent_gdvsch'})
-                    
-            if not table:
-                error_msg = "Project table not found in response"
-                logger.error(error_msg)
-                self.debug_info.append(error_msg)
-                return []
+            async with self._create_session() as session:
+                projects = []
+                detailed_projects = []
+                tasks = []
+                table_rows = 0
                 
-            projects = []
-            detailed_projects = []
-            
-            # Process each row in the table
-            rows = table.find_all('tr')
-            total_rows = len(rows)
-            
-            # Skip header row
-            for i, row in enumerate(rows[1:], 1):
-                try:
-                    cells = row.find_all('td')
+                # Rows repeating a project link share one detail fetch
+                detail_tasks: Dict[str, asyncio.Future] = {}
+                
+                # Fetch project details concurrently, bounded by the semaphore
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                
+                async def fetch_details(project: Dict, origin_id: str, app_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+                    async with semaphore:
+                        try:
+                            return await self.get_project_details(session, project['Link'], origin_id, app_id)
+                        except Exception as e:
+                            logger.error(f"Error getting details for project {project['Link']}: {str(e)}")
+                            return None, None
+                
+                def process_row(row: etree._Element) -> None:
+                    cells = row.findall('td')
                     if len(cells) >= 3:
                         # Get the link from the first cell
-                        link = cells[0].find('a')
-                        if link and 'ApplicationSummary.aspx' in link.get('href', ''):
+                        link = cells[0].find('.//a')
+                        if link is not None and 'ApplicationSummary.aspx' in link.get('href', ''):
                             href = link.get('href', '')
                             
                             # Extract DSA AppId from the URL parameters
-                            parsed_url = urlparse(href)
-                            query_params = parse_qs(parsed_url.query)
-                            origin_id = query_params.get('OriginId', [''])[0]
-                            app_id = query_params.get('AppId', [''])[0]
+                            query_ids = dict(_QUERY_ID_RE.findall(href))
+                            origin_id = query_ids.get('OriginId', '')
+                            app_id = query_ids.get('AppId', '')
                             dsa_appid = f"{origin_id} {app_id}" if origin_id and app_id else ""
                             
                             project = {
                                 'Link': urljoin(self.base_url, href),
                                 'DSA AppId': dsa_appid,
                                 'PTN': '',  # Will be filled from detail page
-                                'Project Name': cells[2].get_text(strip=True),
+                                'Project Name': ''.join(cells[2].itertext()).strip(),
                                 'Project Scope': '',
                                 'Project Cert Type': '',
                                 'Address': '',  # Will be filled from detail page
                                 'City': '',     # Will be filled from detail page
                                 'ZIP': ''       # Will be filled from detail page
                             }
-                            
-                            # Get project details
+                            projects.append(project)
+                            task = detail_tasks.get(project['Link'])
+                            if task is None:
+                                task = detail_tasks[project['Link']] = asyncio.ensure_future(
+                                    fetch_details(project, origin_id, app_id)
+                                )
+                            tasks.append(task)
+                
+                # Rows are handled as the listing downloads, then dropped to keep memory flat
+                parser = etree.HTMLPullParser(events=('end',), tag='tr')
+                
+                def process_events() -> None:
+                    nonlocal table_rows
+                    for _, row in parser.read_events():
+                        table = next(row.iterancestors('table'), None)
+                        if table is not None and table.get('id') == PROJECT_TABLE_ID:
+                            table_rows += 1
                             try:
-                                basic_info, detailed_info = self.get_project_details(project['Link'])
-                                if basic_info:
-                                    project.update(basic_info)
-                                    # Ensure address fields are copied from detailed_info if not in basic_info
-                                    if detailed_info:
-                                        for field in ['Address', 'City', 'ZIP']:
-                                            if field not in basic_info and field in detailed_info:
-                                                project[field] = detailed_info[field]
-                                if detailed_info:
-                                    detailed_project = project.copy()
-                                    detailed_project.update(detailed_info)
-                                    detailed_projects.append(detailed_project)
+                                process_row(row)
                             except Exception as e:
-                                logger.error(f"Error getting details for project {project['Link']}: {str(e)}")
-                            
-                            projects.append(project)
-                            
-                            if progress_bar:
-                                progress_bar.progress(i / (total_rows - 1))
-                            if status_text:
-                                status_text.text(f"Processing project {i} of {total_rows - 1}")
-                            
-                except Exception as e:
-                    error_info = f"Error processing row {i}: {str(e)}\n{traceback.format_exc()}"
-                    logger.error(error_info)
-                    self.debug_info.append(error_info)
-                    continue
-                    
-            return projects, detailed_projects
+                                error_info = f"Error processing row {table_rows}: {_describe_error(e)}"
+                                logger.error(error_info)
+                                self.debug_info.append(error_info)
+                        row.clear()
+                        while row.getprevious() is not None:
+                            del row.getparent()[0]
+                
+                def feed(chunk: str) -> None:
+                    parser.feed(chunk)
+                    process_events()
+                
+                # Always fetch the listing fresh so new projects are picked up
+                await self._fetch(session, url, cacheable=False, feed=feed)
+                parser.close()
+                process_events()
+                
+                if not table_rows:
+                    error_msg = "Project table not found in response"
+                    logger.error(error_msg)
+                    self.debug_info.append(error_msg)
+                    return []
+                
+                # Each widget update is a websocket message, so refresh at most once per
+                # percent and per update interval, always showing the final count
+                total = len(detail_tasks)
+                update_every = max(1, total // 100)
+                last_update = 0.0
+                for completed, next_done in enumerate(asyncio.as_completed(detail_tasks.values()), 1):
+                    await next_done
+                    if completed != total and (completed % update_every
+                                               or time.monotonic() - last_update < PROGRESS_UPDATE_INTERVAL):
+                        continue
+                    last_update = time.monotonic()
+                    if progress_bar:
+                        progress_bar.progress(completed / total)
+                    if status_text:
+                        status_text.text(f"Processing project {completed} of {total}")
+                
+                # Merge results in table order
+                for project, task in zip(projects, tasks):
+                    basic_info, detailed_info = task.result()
+                    if basic_info:
+                        project.update(basic_info)
+                        # Ensure address fields are copied from detailed_info if not in basic_info
+                        if detailed_info:
+                            for field in ['Address', 'City', 'ZIP']:
+                                if field not in basic_info and field in detailed_info:
+                                    project[field] = detailed_info[field]
+                    if detailed_info:
+                        detailed_projects.append({**project, **detailed_info})
+                        
+                return projects, detailed_projects
             
         except Exception as e:
-            error_info = f"Error fetching project list: {str(e)}\n{traceback.format_exc()}"
+            error_info = f"Error fetching project list: {_describe_error(e)}"
             logger.error(error_info)
             self.debug_info.append(error_info)
             raise
 
-    def get_project_details(self, url: str) -> Optional[Dict]:
+    async def get_project_details(self, session: aiohttp.ClientSession, url: str, origin_id: str, app_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Get project details with enhanced error handling and debugging."""
+        cert_task = None
+        cert_url = f"{self.base_url}ProjectCloseout.aspx?OriginId={origin_id}&AppId={app_id}" if origin_id and app_id else None
         try:
-            # First get the application summary page
-            response = self._make_request(url)
-            if not response:
-                return None, None
+            # Without a rate limit, request the Project Certification page alongside the
+            # summary page and drop it below if the project turns out to be open; that trades
+            # latency for load, since the request is usually already sent by then, so skipping
+            # open or summary-certified projects only saves requests under a rate limit, where
+            # a speculative request would use up a slot and we wait for the summary instead
+            if cert_url and not self.limiter.interval:
+                cert_task = asyncio.ensure_future(self._fetch(session, cert_url))
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            # Get the application summary page
+            html = await self._fetch(session, url)
+            if not html:
+                return None, None
             
             # Initialize both basic and detailed info dictionaries
             basic_info = {}
             detailed_info = {}
             
+            # Parse in a worker thread so the event loop keeps servicing other downloads
+            cell_texts, indicator_states = await asyncio.to_thread(_parse_cells, html)
+            
+            # Map each label cell to the text of the cell that follows it
+            label_map = {}
+            for label, value in zip(cell_texts, cell_texts[1:]):
+                if label.endswith(':'):
+                    label_map.setdefault(_label_key(label), value)
+            
             # Look for PTN in the detail page
-            ptn = ""
-            ptn_cell = soup.find('td', string=re.compile(r'PTN\s+#:', re.I))
-            if ptn_cell and ptn_cell.find_next('td'):
-                ptn = ptn_cell.find_next('td').get_text(strip=True)
+            ptn = label_map.get('ptn #:')
+            if ptn is not None:
                 basic_info['PTN'] = ptn
                 detailed_info['PTN'] = ptn
             
             # Look for project name in a table cell
-            project_name = ""
-            name_cell = soup.find('td', string=re.compile(r'Project\s+Name:', re.I))
-            if name_cell and name_cell.find_next('td'):
-                project_name = name_cell.find_next('td').get_text(strip=True)
+            project_name = label_map.get('project name:')
+            if project_name is not None:
                 basic_info['Project Name'] = project_name
                 detailed_info['Project Name'] = project_name
             
             # Look for project scope in a table cell
-            scope = ""
-            scope_cell = soup.find('td', string=re.compile(r'Project\s+Scope:', re.I))
-            if scope_cell and scope_cell.find_next('td'):
-                scope = scope_cell.find_next('td').get_text(strip=True)
-            
+            scope = label_map.get('project scope:', '')
             basic_info['Project Scope'] = scope
             detailed_info['Project Scope'] = scope
 
             # Look for ZIP code
-            zip_code = ""
-            zip_cell = soup.find('td', string=re.compile(r'Zip:', re.I))
-            if zip_cell and zip_cell.find_next('td'):
-                zip_code = zip_cell.find_next('td').get_text(strip=True)
+            zip_code = label_map.get('zip:')
+            if zip_code is not None:
                 detailed_info['ZIP'] = zip_code
 
-            # Get certification info from the Project Certification page
-            cert_type = ""
+            # Extract all field values
+            for label, key in _FIELD_LABELS.items():
+                value = label_map.get(label)
+                if value:
+                    detailed_info[key] = value
+            
+            # Get checkbox/indicator fields
+            detailed_info.update(indicator_states)
+            
+            # Use certification info already shown on the summary page when present; take only
+            # the matched text, since an outer layout cell holds the text of every cell inside it
+            cert_match = next(filter(None, map(_CERT_PATTERN_RE.search, cell_texts)), None)
+            cert_type = label_map.get('last certification letter type:') or (cert_match.group(0) if cert_match else "")
+            
+            # Otherwise get it from the Project Certification page
             try:
-                # Extract AppId and OriginId from the current URL
-                parsed_url = urlparse(url)
-                query_params = parse_qs(parsed_url.query)
-                origin_id = query_params.get('OriginId', [''])[0]
-                app_id = query_params.get('AppId', [''])[0]
-                
-                if origin_id and app_id:
-                    # Construct the Project Certification URL
-                    cert_url = f"{self.base_url}ProjectCloseout.aspx?OriginId={origin_id}&AppId={app_id}"
-                    cert_response = self._make_request(cert_url)
-                    
-                    if cert_response:
-                        cert_soup = BeautifulSoup(cert_response.text, 'lxml')
-                        
-                        # Look for Last Certification Letter Type in any table cell
-                        cert_type_cell = cert_soup.find('td', string=re.compile(r'Last Certification Letter Type:', re.I))
-                        if cert_type_cell:
-                            next_cell = cert_type_cell.find_next('td')
-                            if next_cell:
-                                cert_type = next_cell.get_text(strip=True)
-                        
-                        # If not found, look for specific certification patterns
-                        if not cert_type:
-                            cert_patterns = [
-                                r'#\d+-Certification & Close of File(?:\s+Per EDU Code \d+\(\w+\)\s+OR\s+\d+\(\w+\))?',
-                                r'DSA 301P Notification of Requirement for Certification',
-                                r'#\d+-Close of File w/o Certification - Exceptions',
-                                r'1 YR VOID'
-                            ]
-                            
-                            for pattern in cert_patterns:
-                                matches = cert_soup.find_all(string=re.compile(pattern, re.I))
-                                if matches:
-                                    cert_type = matches[0].strip()
-                                    break
+                if cert_url and not cert_type:
+                    if not detailed_info.get('Closed Date'):
+                        # Certification letters are issued at close of file, so an open
+                        # project has nothing to find on the certification page; only count
+                        # it as skipped if it wasn't already requested speculatively
+                        if cert_task is None:
+                            self.stats['cert_pages_skipped'] += 1
+                    else:
+                        cert_html = await (cert_task if cert_task is not None else self._fetch(session, cert_url))
+                        if cert_html:
+                            cert_type = await asyncio.to_thread(_find_cert_type, cert_html)
             except Exception as e:
                 logger.error(f"Error getting certification details: {str(e)}")
 
             basic_info['Project Cert Type'] = cert_type
             detailed_info['Project Cert Type'] = cert_type
             
-            # Collect detailed information
-            field_mappings = {
-                'Office ID:': 'Office ID',
-                'Application #:': 'Application #',
-                'File #:': 'File #',
-                'PTN #:': 'PTN #',
-                'OPSC #:': 'OPSC #',
-                'Project Type:': 'Project Type',
-                'Project Class:': 'Project Class',
-                'Special Type:': 'Special Type',
-                '# Of Incr:': 'Number of Increments',
-                'Address:': 'Address',
-                'City:': 'City',
-                'Zip:': 'Zip',
-                'Estimated Amt:': 'Estimated Amount',
-                'Contracted Amt:': 'Contracted Amount',
-                'Construction Change Document Amt:': 'Change Document Amount',
-                'Final Project Cost:': 'Final Project Cost',
-                'Adj Est.Date#1:': 'Adjustment Date 1',
-                'Adj Est.Amt#1:': 'Adjustment Amount 1',
-                'Adj Est.Date#2:': 'Adjustment Date 2',
-                'Adj Est.Amt#2:': 'Adjustment Amount 2',
-                'Received Date:': 'Received Date',
-                'Approved Date:': 'Approved Date',
-                'Approval Ext. Date:': 'Approval Extension Date',
-                'Closed Date:': 'Closed Date',
-                'Complete Submittal Received Date:': 'Complete Submittal Date'
-            }
-            
-            # Extract all field values
-            for field, key in field_mappings.items():
-                field_cell = soup.find('td', string=re.compile(rf'^{field}$', re.I))
-                if field_cell and field_cell.find_next('td'):
-                    value = field_cell.find_next('td').get_text(strip=True)
-                    if value:
-                        detailed_info[key] = value
-            
-            # Get checkbox/indicator fields
-            indicators = {
-                'SB 575': 'SB 575',
-                'New Campus': 'New Campus',
-                'Modernization': 'Modernization',
-                'Auto Fire Detection': 'Auto Fire Detection',
-                'Sprinkler System': 'Sprinkler System',
-                'Access Compliance': 'Access Compliance',
-                'Fire & Life Safety': 'Fire & Life Safety',
-                'Structural Safety': 'Structural Safety',
-                'Field Review': 'Field Review',
-                'CGS Review': 'CGS Review',
-                'HPS': 'HPS'
-            }
-            
-            for indicator, key in indicators.items():
-                indicator_cell = soup.find('td', string=re.compile(rf'^{indicator}$', re.I))
-                if indicator_cell:
-                    # Check if there's an input checkbox and if it's checked
-                    checkbox = indicator_cell.find_previous('input', {'type': 'checkbox'})
-                    if checkbox and checkbox.get('checked'):
-                        detailed_info[key] = 'Yes'
-                    else:
-                        detailed_info[key] = 'No'
-            
             return basic_info, detailed_info
             
         except Exception as e:
             logger.error(f"Error getting project details from {url}: {str(e)}")
             return None, None
+        
+        finally:
+            if cert_task is not None:
+                self._discard(cert_task)
+
+    @staticmethod
+    def _discard(task: asyncio.Future) -> None:
+        """Cancel a speculative fetch, or retrieve its outcome if it already finished."""
+        if not task.cancel() and not task.cancelled():
+            task.exception()
 
     def get_stats(self) -> Dict:
         """Get current scraping statistics."""
@@ -368,6 +651,197 @@ class DSAScraper:
         stats['elapsed_time'] = str(datetime.now() - stats['start_time'])
         return stats
 
+def _write_rows(worksheet: Any, df: pd.DataFrame) -> None:
+    """Write DataFrame rows below the header, strictly in row order as constant_memory requires."""
+    for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, [None if pd.isna(value) else value for value in row])
+
+@st.cache_data(max_entries=8)
+def _build_excel(basic_df: pd.DataFrame, detailed_df: pd.DataFrame) -> bytes:
+    """Build the formatted Excel workbook and return its bytes."""
+    raw_df, financial_df, technical_df = _sheet_frames(detailed_df)
+    
+    # Create Excel writer object; constant_memory streams each sheet row by row
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        # Get workbook object
+        workbook = writer.book
+        
+        # Add formats
+        money_format = workbook.add_format({'num_format': '$#,##0.00'})
+        date_format = workbook.add_format({'num_format': 'mm/dd/yyyy'})
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#D3D3D3',
+            'border': 1
+        })
+        
+        # Each sheet is formatted before its rows are written, since constant_memory
+        # mode can't go back to rows that have already been flushed
+        
+        # Format Project List worksheet
+        worksheet = workbook.add_worksheet('Project List')
+        # Set column widths based on the image layout
+        column_widths = {
+            'Link': 8,
+            'DSA AppId': 15,
+            'PTN': 15,
+            'Project Name': 30,
+            'Project Scope': 40,
+            'Project Cert Type': 30,
+            'Address': 35,
+            'City': 20,
+            'ZIP': 10
+        }
+        
+        for idx, col in enumerate(basic_df.columns):
+            worksheet.set_column(idx, idx, column_widths[col])
+            worksheet.write(0, idx, col, header_format)
+        _write_rows(worksheet, basic_df)
+        
+        # Format the detail worksheets from the column spec table
+        formats = {'money': money_format, 'date': date_format, None: None}
+        for name, df in (('RAW DATA', raw_df), ('Financial Details', financial_df),
+                         ('Technical Requirements', technical_df)):
+            worksheet = workbook.add_worksheet(name)
+            for idx, col in enumerate(df.columns):
+                width, format_key = COLUMN_SPECS.get(col, DEFAULT_COLUMN_SPEC)
+                worksheet.set_column(idx, idx, width, formats[format_key])
+                worksheet.write(0, idx, col, header_format)
+            worksheet.freeze_panes(1, 0)
+            _write_rows(worksheet, df)
+    
+    return output.getvalue()
+
+def _show_preview(df: pd.DataFrame, key: str) -> None:
+    """Show one page of a DataFrame so large results don't ship every row to the browser."""
+    pages = max(1, -(-len(df) // PREVIEW_ROWS))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key)
+    start = (page - 1) * PREVIEW_ROWS
+    if pages > 1:
+        st.caption(f"Rows {start + 1}-{min(start + PREVIEW_ROWS, len(df))} of {len(df)}; download the workbook for all rows")
+    st.dataframe(df.iloc[start:start + PREVIEW_ROWS], width='stretch', height=PREVIEW_HEIGHT, hide_index=True)
+
+@st.fragment
+def _show_results(basic_df: pd.DataFrame, raw_df: pd.DataFrame, financial_df: pd.DataFrame,
+                  technical_df: pd.DataFrame) -> None:
+    """Show the preview tabs as a fragment, so paging a preview reruns only the tabs."""
+    tab1, tab2, tab3, tab4 = st.tabs(["📋 Project List", "📝 RAW DATA", "💰 Financial Details", "🔧 Technical Requirements"])
+    
+    with tab1:
+        _show_preview(basic_df, key='preview-basic')
+    
+    with tab2:
+        _show_preview(raw_df, key='preview-raw')
+    
+    with tab3:
+        _show_preview(financial_df, key='preview-financial')
+    
+    with tab4:
+        _show_preview(technical_df, key='preview-technical')
+
+class _QueueReporter:
+    """Stands in for the progress widgets inside the scrape thread, forwarding updates to a queue."""
+
+    def __init__(self, updates: queue.Queue):
+        self.updates = updates
+
+    def progress(self, value: float) -> None:
+        self.updates.put(('progress', value))
+
+    def text(self, value: str) -> None:
+        self.updates.put(('text', value))
+
+@st.cache_data(ttl="15m", max_entries=32)
+def _build_frames(job_key: Tuple[str, float], _projects: List[Dict],
+                  _detailed_projects: List[Dict]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Build the project list and detailed DataFrames for a scrape once; reruns of the same job reuse them."""
+    # Ensure columns are in the correct order to match the image exactly
+    basic_columns = ['Link', 'DSA AppId', 'PTN', 'Project Name', 'Project Scope', 'Project Cert Type', 'Address', 'City', 'ZIP']
+    basic_df = pd.DataFrame.from_records(_projects, columns=basic_columns)
+    
+    # Build the detailed frame once; the other sheets are column selections of it
+    detailed_df = pd.DataFrame.from_records(_detailed_projects)
+    category_columns = [col for col in CATEGORY_COLUMNS if col in detailed_df.columns]
+    detailed_df[category_columns] = detailed_df[category_columns].astype('category')
+    
+    return basic_df, detailed_df
+
+def _sheet_frames(detailed_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Select the RAW DATA, Financial Details and Technical Requirements columns from the detailed frame."""
+    # Create Raw Data DataFrame for address verification
+    raw_columns = [
+        'DSA AppId', 'Project Name', 'Address', 'City', 'ZIP',
+        'Project Type', 'Project Class', 'Received Date'
+    ]
+    raw_df = detailed_df.reindex(columns=raw_columns)
+    
+    # Create Financial Details DataFrame
+    financial_columns = [
+        'DSA AppId', 'Project Name', 'PTN',
+        'Estimated Amount', 'Contracted Amount', 'Change Document Amount', 'Final Project Cost',
+        'Received Date', 'Approved Date', 'Closed Date',
+        'Project Type', 'Project Class', 'Address', 'City'
+    ]
+    financial_df = detailed_df.reindex(columns=[col for col in financial_columns if col in detailed_df.columns])
+    
+    # Create Technical Requirements DataFrame
+    technical_columns = [
+        'DSA AppId', 'Project Name', 'Project Type', 'Project Class',
+        'Access Compliance', 'Fire & Life Safety', 'Structural Safety',
+        'Auto Fire Detection', 'Sprinkler System', 'Field Review',
+        'CGS Review', 'HPS', 'Special Type', 'Number of Increments'
+    ]
+    technical_df = detailed_df.reindex(columns=[col for col in technical_columns if col in detailed_df.columns])
+    
+    return raw_df, financial_df, technical_df
+
+def _start_scrape(scraper: DSAScraper, client_id: str) -> Dict[str, Any]:
+    """Run a scrape in a background thread so Streamlit reruns don't restart it."""
+    job = {'scraper': scraper, 'key': (client_id, time.time()), 'updates': queue.Queue(), 'result': None, 'error': None}
+    # Name the export once per scrape so reruns keep the same download file name
+    job['file_stem'] = f"dsa_projects_{time.strftime('%Y%m%d_%H%M%S')}"
+    reporter = _QueueReporter(job['updates'])
+
+    def run():
+        try:
+            job['result'] = scraper.get_project_list(client_id, progress_bar=reporter, status_text=reporter)
+        except Exception as e:
+            job['error'] = e
+        finally:
+            # Snapshot the stats so later reruns don't keep extending the elapsed time
+            job['stats'] = scraper.get_stats()
+
+    job['thread'] = threading.Thread(target=run, daemon=True)
+    job['thread'].start()
+    return job
+
+def _wait_for_scrape(job: Dict[str, Any]) -> Any:
+    """Mirror a running scrape's queued progress onto the page until it finishes, then return its result."""
+    if job['thread'].is_alive():
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        while True:
+            finished = not job['thread'].is_alive()
+            while True:
+                try:
+                    kind, value = job['updates'].get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'progress':
+                    progress_bar.progress(value)
+                else:
+                    status_text.text(value)
+            if finished:
+                break
+            time.sleep(PROGRESS_POLL_INTERVAL)
+    
+    if job['error'] is not None:
+        raise job['error']
+    return job['result']
+
 def main():
     st.set_page_config(
         page_title="DSA Project Scraper",
@@ -390,14 +864,20 @@ def main():
         st.header("⚙️ Settings")
         client_id = st.text_input("Client ID", value="36-67")
         
-        st.subheader("Request Delay")
-        request_delay = st.slider(
-            "Delay between requests (seconds)",
-            min_value=0.0,
-            max_value=1.0,
-            value=0.0,
-            step=0.1,
-            help="Add delay between requests to avoid rate limiting (0 = no delay, 1 = 1 second delay)"
+        st.subheader("Request Rate")
+        max_rate = st.slider(
+            "Max requests per second",
+            min_value=0,
+            max_value=20,
+            value=0,
+            step=1,
+            help="Limit the overall request rate to avoid rate limiting (0 = no limit)"
+        )
+        
+        use_cache = st.checkbox(
+            "Use cache",
+            value=True,
+            help="Reuse pages fetched in the last 24 hours instead of downloading them again"
         )
         
         use_proxy = st.checkbox("Use Proxy")
@@ -436,7 +916,7 @@ def main():
         st.markdown("### 🚀 Getting Started")
         st.markdown("""
         1. Enter your Client ID (default: 36-67)
-        2. Adjust the request delay if needed
+        2. Adjust the request rate limit if needed
         3. Click "Start Scraping" to begin
         4. Download your Excel file when complete
         """)
@@ -452,50 +932,29 @@ def main():
         """)
     
     # Main content - Start button
-    if st.button("🚀 Start Scraping", type="primary"):
-        try:
-            scraper = DSAScraper(use_proxy=use_proxy, proxy=proxy, request_delay=request_delay)
-            
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+    # The scrape runs in a background thread kept in session state, so reruns
+    # triggered by other widgets pick up the same job instead of restarting it
+    job = st.session_state.get('scrape_job')
+    running = job is not None and job['thread'].is_alive()
+    start = st.button("🚀 Start Scraping", type="primary", disabled=running)
+    
+    try:
+        if start:
+            scraper = DSAScraper(use_proxy=use_proxy, proxy=proxy, max_rate=max_rate, use_cache=use_cache)
+            job = st.session_state['scrape_job'] = _start_scrape(scraper, client_id)
+        
+        if job is not None:
+            projects, detailed_projects = _wait_for_scrape(job)
             
-            projects, detailed_projects = scraper.get_project_list(
-                client_id=client_id,
-                progress_bar=progress_bar,
-                status_text=status_text
-            )
+            # The button was drawn disabled while this job ran; rerun so it comes back enabled
+            if running:
+                st.rerun()
             
             if projects:
-                # Create DataFrames
-                basic_df = pd.DataFrame(projects)
-                # Ensure columns are in the correct order to match the image exactly
-                basic_columns = ['Link', 'DSA AppId', 'PTN', 'Project Name', 'Project Scope', 'Project Cert Type', 'Address', 'City', 'ZIP']
-                basic_df = basic_df.reindex(columns=basic_columns)
-                
-                # Create Raw Data DataFrame for address verification
-                raw_columns = [
-                    'DSA AppId', 'Project Name', 'Address', 'City', 'ZIP',
-                    'Project Type', 'Project Class', 'Received Date'
-                ]
-                raw_df = pd.DataFrame(detailed_projects).reindex(columns=raw_columns)
-                
-                # Create Financial Details DataFrame
-                financial_columns = [
-                    'DSA AppId', 'Project Name', 'PTN',
-                    'Estimated Amount', 'Contracted Amount', 'Change Document Amount', 'Final Project Cost',
-                    'Received Date', 'Approved Date', 'Closed Date',
-                    'Project Type', 'Project Class', 'Address', 'City'
-                ]
-                financial_df = pd.DataFrame(detailed_projects).reindex(columns=[col for col in financial_columns if col in pd.DataFrame(detailed_projects).columns])
-                
-                # Create Technical Requirements DataFrame
-                technical_columns = [
-                    'DSA AppId', 'Project Name', 'Project Type', 'Project Class',
-                    'Access Compliance', 'Fire & Life Safety', 'Structural Safety',
-                    'Auto Fire Detection', 'Sprinkler System', 'Field Review',
-                    'CGS Review', 'HPS', 'Special Type', 'Number of Increments'
-                ]
-                technical_df = pd.DataFrame(detailed_projects).reindex(columns=[col for col in technical_columns if col in pd.DataFrame(detailed_projects).columns])
+                # Create DataFrames, cached per scrape job since every widget interaction reruns main()
+                # Only the detailed frame is stored; the detail sheets are copy-on-write column views of it
+                basic_df, detailed_df = _build_frames(job['key'], projects, detailed_projects)
+                raw_df, financial_df, technical_df = _sheet_frames(detailed_df)
                 
                 # Address Normalization
                 st.subheader("🏠 Address Normalization")
@@ -503,15 +962,13 @@ def main():
                     normalizer = AddressNormalizer()
                     
                     # Prepare addresses for batch normalization
-                    addresses_to_normalize = []
-                    for idx, row in basic_df.iterrows():
-                        if pd.notna(row['Address']) and pd.notna(row['City']):
-                            addresses_to_normalize.append({
-                                'address': row['Address'],
-                                'city': row['City'],
-                                'zip': row['ZIP'] if pd.notna(row['ZIP']) else '',
-                                'project_name': row['Project Name']
-                            })
+                    has_address = basic_df['Address'].notna() & basic_df['City'].notna()
+                    addresses_to_normalize = (
+                        basic_df.loc[has_address, ['Address', 'City', 'ZIP', 'Project Name']]
+                        .fillna({'ZIP': ''})
+                        .rename(columns={'Address': 'address', 'City': 'city', 'ZIP': 'zip', 'Project Name': 'project_name'})
+                        .to_dict('records')
+                    )
                     
                     # Show progress for address normalization
                     st.text("🔄 Normalizing addresses...")
@@ -520,26 +977,23 @@ def main():
                     # Perform batch normalization
                     normalized_addresses = normalizer.normalize_batch(addresses_to_normalize)
                     
-                    # Update the DataFrame with normalized addresses
+                    # Update the DataFrame with normalized addresses, column-wise rather than per row
                     normalized_df = basic_df.copy()
-                    for idx, row in normalized_df.iterrows():
-                        if pd.notna(row['Address']) and pd.notna(row['City']):
-                            key = f"{row['Address']}, {row['City']}"
-                            if pd.notna(row['ZIP']):
-                                key += f" {row['ZIP']}"
-                            
-                            if key in normalized_addresses:
-                                normalized = normalized_addresses[key]
-                                parts = normalized.split(',')
-                                if len(parts) >= 2:
-                                    normalized_df.at[idx, 'Address'] = parts[0].strip()
-                                    city_zip = parts[1].strip().split()
-                                    if len(city_zip) >= 2:
-                                        normalized_df.at[idx, 'City'] = ' '.join(city_zip[:-1])
-                                        normalized_df.at[idx, 'ZIP'] = city_zip[-1]
-                        
-                        # Update progress
-                        progress_bar.progress((idx + 1) / len(normalized_df))
+                    keys = basic_df['Address'].astype(str) + ', ' + basic_df['City'].astype(str)
+                    keys = keys.where(basic_df['ZIP'].isna(), keys + ' ' + basic_df['ZIP'].astype(str))
+                    normalized = keys[has_address].map(normalized_addresses).dropna()
+                    
+                    # Results look like "street, city zip"; the street is used whenever a city part exists
+                    parts = normalized.astype(object).str.split(',')
+                    parts = parts[parts.str.len() >= 2]
+                    if not parts.empty:
+                        normalized_df.loc[parts.index, 'Address'] = parts.str[0].str.strip()
+                        city_zip = parts.str[1].str.split()
+                        city_zip = city_zip[city_zip.str.len() >= 2]
+                        normalized_df.loc[city_zip.index, 'City'] = city_zip.str[:-1].str.join(' ')
+                        normalized_df.loc[city_zip.index, 'ZIP'] = city_zip.str[-1]
+                    
+                    progress_bar.progress(1.0)
                     
                     # Show changes
                     if normalized_addresses:
@@ -548,7 +1002,7 @@ def main():
                             [(orig, norm) for orig, norm in normalized_addresses.items()],
                             columns=['Original Address', 'Normalized Address']
                         )
-                        st.dataframe(changes_df, use_container_width=True)
+                        st.dataframe(changes_df, width='stretch')
                         
                         # Add analysis of city discrepancies
                         city_conflicts = []
@@ -569,7 +1023,7 @@ def main():
                         if city_conflicts:
                             st.write("⚠️ Found city name discrepancies:")
                             conflicts_df = pd.DataFrame(city_conflicts)
-                            st.dataframe(conflicts_df, use_container_width=True)
+                            st.dataframe(conflicts_df, width='stretch')
                         
                         # Option to use normalized addresses
                         if st.checkbox("Use normalized addresses in export", value=True):
@@ -584,120 +1038,53 @@ def main():
                     st.write(f"- Cache hits: {cache_stats['hits']}")
                     st.write(f"- Cache misses: {cache_stats['misses']}")
                 
-                # Create Excel writer object
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    # Write each DataFrame to a different worksheet
-                    basic_df.to_excel(writer, sheet_name='Project List', index=False)
-                    raw_df.to_excel(writer, sheet_name='RAW DATA', index=False)
-                    financial_df.to_excel(writer, sheet_name='Financial Details', index=False)
-                    technical_df.to_excel(writer, sheet_name='Technical Requirements', index=False)
-                    
-                    # Get workbook and worksheet objects
-                    workbook = writer.book
-                    
-                    # Add formats
-                    money_format = workbook.add_format({'num_format': '$#,##0.00'})
-                    date_format = workbook.add_format({'num_format': 'mm/dd/yyyy'})
-                    header_format = workbook.add_format({
-                        'bold': True,
-                        'bg_color': '#D3D3D3',
-                        'border': 1
-                    })
-                    
-                    # Format Project List worksheet
-                    worksheet = writer.sheets['Project List']
-                    # Set column widths based on the image layout
-                    column_widths = {
-                        'Link': 8,
-                        'DSA AppId': 15,
-                        'PTN': 15,
-                        'Project Name': 30,
-                        'Project Scope': 40,
-                        'Project Cert Type': 30,
-                        'Address': 35,
-                        'City': 20,
-                        'ZIP': 10
-                    }
-                    
-                    for idx, col in enumerate(basic_columns):
-                        worksheet.set_column(idx, idx, column_widths[col])
-                        worksheet.write(0, idx, col, header_format)
-                    
-                    # Format RAW DATA worksheet
-                    worksheet = writer.sheets['RAW DATA']
-                    for idx, col in enumerate(raw_df.columns):
-                        if 'Date' in col:
-                            worksheet.set_column(idx, idx, 12, date_format)
-                        else:
-                            worksheet.set_column(idx, idx, 20)
-                        worksheet.write(0, idx, col, header_format)
-                    worksheet.freeze_panes(1, 0)
-                    
-                    # Format Financial Details worksheet
-                    worksheet = writer.sheets['Financial Details']
-                    for idx, col in enumerate(financial_df.columns):
-                        if 'Amount' in col or 'Cost' in col:
-                            worksheet.set_column(idx, idx, 15, money_format)
-                        elif 'Date' in col:
-                            worksheet.set_column(idx, idx, 12, date_format)
-                        else:
-                            worksheet.set_column(idx, idx, 20)
-                        worksheet.write(0, idx, col, header_format)
-                    worksheet.freeze_panes(1, 0)
-                    
-                    # Format Technical Requirements worksheet
-                    worksheet = writer.sheets['Technical Requirements']
-                    for idx, col in enumerate(technical_df.columns):
-                        worksheet.set_column(idx, idx, 20)
-                        worksheet.write(0, idx, col, header_format)
-                    worksheet.freeze_panes(1, 0)
-                
                 # Display results
                 st.success(f"✅ Successfully scraped {len(projects)} projects!")
                 
-                # Offer Excel download
+                # Offer Excel download; the workbook is only built when the button is clicked,
+                # and very large results need an explicit opt-in since xlsx memory grows with size
+                too_large = len(basic_df) > XLSX_ROW_LIMIT
+                if too_large:
+                    st.warning(f"⚠️ {len(basic_df):,} projects is a very large Excel workbook; the CSV download is recommended.")
+                if not too_large or st.checkbox("Build the Excel workbook anyway"):
+                    st.download_button(
+                        "📥 Download Excel Workbook",
+                        lambda: _build_excel(basic_df, detailed_df),
+                        f"{job['file_stem']}.xlsx",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key='download-excel'
+                    )
+                
+                # Offer the project list as CSV
                 st.download_button(
-                    "📥 Download Excel Workbook",
-                    output.getvalue(),
-                    f"dsa_projects_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key='download-excel'
+                    "📄 Download Project List CSV",
+                    lambda: basic_df.to_csv(index=False).encode(),
+                    f"{job['file_stem']}.csv",
+                    "text/csv",
+                    key='download-csv'
                 )
                 
                 # Show preview tabs
-                tab1, tab2, tab3, tab4 = st.tabs(["📋 Project List", "📝 RAW DATA", "💰 Financial Details", "🔧 Technical Requirements"])
-                
-                with tab1:
-                    st.dataframe(basic_df, use_container_width=True)
-                
-                with tab2:
-                    st.dataframe(raw_df, use_container_width=True)
-                
-                with tab3:
-                    st.dataframe(financial_df, use_container_width=True)
-                
-                with tab4:
-                    st.dataframe(technical_df, use_container_width=True)
+                _show_results(basic_df, raw_df, financial_df, technical_df)
                 
                 # Show statistics
-                stats = scraper.get_stats()
+                stats = job['stats']
                 st.subheader("📊 Scraping Statistics")
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Requests", stats['total_requests'])
-                with col2:
-                    st.metric("Successful Requests", stats['successful_requests'])
-                with col3:
-                    st.metric("Failed Requests", stats['failed_requests'])
-                with col4:
-                    st.metric("Total Time", str(stats['elapsed_time']))
+                stats_df = pd.DataFrame({
+                    'Total Requests': [stats['total_requests']],
+                    'Successful Requests': [stats['successful_requests']],
+                    'Failed Requests': [stats['failed_requests']],
+                    'Cancelled Requests': [stats['cancelled_requests']],
+                    'Cache Hits': [stats['cache_hits']],
+                    'Total Time': [str(stats['elapsed_time'])]
+                })
+                st.dataframe(stats_df, width='stretch', hide_index=True)
             else:
                 st.error("❌ No projects found. Please check the Client ID and try again.")
                 
-        except Exception as e:
-            st.error(f"❌ Error during scraping: {str(e)}")
-            logger.error(f"Scraping error: {str(e)}", exc_info=True)
+    except Exception as e:
+        st.error(f"❌ Error during scraping: {str(e)}")
+        logger.error(f"Scraping error: {str(e)}", exc_info=True)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file